@@ -4,19 +4,72 @@
 支持获取课程列表、查询特定课程、自动抢课等功能
 """
 
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import orjson
 import time
+import random
 import re
 import ntplib
 import threading
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from queue import SimpleQueue, Empty
+from collections import deque
+from concurrent.futures import (
+    ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError,
+)
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any, Iterable
+from typing import Optional, Dict, List, Any, Callable, Iterable, Iterator, Mapping, Tuple, Union
 from dataclasses import dataclass
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
+from types import MappingProxyType
+
+
+def _jloads(data: Any) -> Any:
+    """解析 JSON（bytes/str 均可），热路径统一走 orjson。"""
+    return orjson.loads(data)
+
+
+def _jdumps(obj: Any, option: Optional[int] = None) -> bytes:
+    """序列化为 UTF-8 JSON bytes，不可序列化对象回退为 str。"""
+    return orjson.dumps(obj, default=str, option=option)
+
+
+BASE_DIR = Path(__file__).resolve().parent  # 程序目录，导入时解析一次
+LOG_ENABLED = os.environ.get("AHU_LOG", "1") != "0"  # AHU_LOG=0 关闭 query.log 记录
+DUPLICATE_KEYWORDS = ("相同教学班只能选一次", "Duplicate lessons are not allowed")
+_EMPTY: Mapping[str, Any] = MappingProxyType({})  # 只读空映射，替代热路径上的 `.get(key, {})` 临时字典
+WEEKDAY_MAP = {1: '星期一', 2: '星期二', 3: '星期三', 4: '星期四', 5: '星期五', 6: '星期六', 7: '星期日'}
+
+
+@lru_cache(maxsize=1024)
+def is_duplicate_message(message: Optional[str]) -> bool:
+    """检测是否为“相同教学班只能选一次”类提示；轮询中同一文本反复出现，按文本缓存结果。"""
+    if not message:
+        return False
+    return any(keyword in message for keyword in DUPLICATE_KEYWORDS)
+
+
+def is_transport_failure(exc: BaseException) -> bool:
+    """超时、连接失败、HTTP 429/5xx：服务端未给出业务答复，视为过载信号。"""
+    # 带 Retry-After 的 429/503 会被连接池的 Retry 转成 RetryError 而非 HTTPError
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError, requests.exceptions.RetryError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return False
+
+
+class UnrecoverableSelectionError(Exception):
+    """重试也不会成功的选课错误（时间冲突、凭证失效等），应立即放弃该课程。"""
 
 
 @dataclass
@@ -31,6 +84,33 @@ class CourseFilter:
     building: str = ""  # 教学楼，如"博北A101"
 
 
+def compile_filter(cf: CourseFilter) -> Callable[[Dict[str, Any]], bool]:
+    """将筛选条件编译为判定函数：筛选常量只计算一次，逐课程仅做子串检查。"""
+    name_needle = cf.course_name
+    # 按区分度从高到低排列，使不匹配的课程尽早被 all() 短路排除
+    place_needles: List[str] = []
+    if cf.building:
+        place_needles.append(cf.building)  # 教室
+    if cf.start_unit > 0 and cf.end_unit > 0:
+        place_needles.append(f"{cf.start_unit}~{cf.end_unit}节")  # 节次
+    if cf.weekday > 0:
+        place_needles.append(WEEKDAY_MAP.get(cf.weekday, ''))  # 星期
+    if cf.weeks:
+        place_needles.append(cf.weeks)  # 周次
+    if cf.campus:
+        place_needles.append(cf.campus)  # 校区
+    needles = tuple(place_needles)
+
+    def match(lesson: Dict[str, Any]) -> bool:
+        get = lesson.get
+        if name_needle and name_needle not in (get('course') or _EMPTY).get('nameZh', ''):
+            return False
+        date_time_place = (get('dateTimePlace') or _EMPTY).get('textZh', '')
+        return all(needle in date_time_place for needle in needles)
+
+    return match
+
+
 class ConsoleUI:
     """轻量级控制台UI，提供统一的输出风格。"""
 
@@ -101,17 +181,75 @@ class ConsoleUI:
         return input(f"[?] {text}: ").strip()
 
 
+@lru_cache(maxsize=8)
+def _read_json_cached(path: str, mtime_ns: int) -> Any:
+    """按 (路径, 修改时间) 缓存 JSON 解析结果，文件未变化时直接复用（结果只读）。"""
+    with open(path, "rb") as f:
+        return _jloads(f.read())
+
+
+class StatusLine:
+    """单行滚动状态：调用方只记录最新文本，由后台线程在内容变化时重绘（限频）。"""
+
+    FRAME_INTERVAL = 0.05  # 最多 20 帧/秒，Windows 终端每次刷新代价较高
+
+    def __init__(self):
+        self._latest = ""
+        self._shown = ""
+        self._closed = False
+        self._changed = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._paint_loop, daemon=True)
+        self._thread.start()
+
+    def update(self, text: str):
+        """记录最新状态；高频更新会被合并为一次重绘。"""
+        self._latest = text
+        self._changed.set()
+
+    def _paint(self):
+        with self._lock:
+            text = self._latest
+            if text == self._shown:
+                return
+            # 新文本直接覆盖旧文本，仅在变短时补空格擦除残留
+            pad = len(self._shown) - len(text)
+            sys.stdout.write(f"\r{text}{' ' * pad}" if pad > 0 else f"\r{text}")
+            sys.stdout.flush()
+            self._shown = text
+
+    def _paint_loop(self):
+        while True:
+            self._changed.wait()
+            # 先清除再检查关闭标志：close() 的唤醒不会被随后的 clear() 吞掉
+            self._changed.clear()
+            if self._closed:
+                return
+            self._paint()
+            time.sleep(self.FRAME_INTERVAL)
+
+    def close(self):
+        """停止后台线程，补画最终状态并换行；可重复调用。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._changed.set()
+        self._thread.join(timeout=1.0)
+        self._paint()
+        if self._shown:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+
 def load_course_targets(file_path: str = "list.json", ui: Optional[ConsoleUI] = None) -> List[Dict[str, Any]]:
     """从JSON文件加载待抢课程列表（包含筛选条件）"""
     ui = ui or ConsoleUI()
-    base_dir = Path(__file__).resolve().parent
     target_path = Path(file_path)
     if not target_path.is_absolute():
-        target_path = base_dir / target_path
+        target_path = BASE_DIR / target_path
 
     try:
-        with target_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _read_json_cached(str(target_path), target_path.stat().st_mtime_ns)
     except FileNotFoundError:
         ui.error(f"未找到课程列表文件: {target_path}")
         ui.info("请在程序目录下创建 list.json（示例已生成）")
@@ -150,6 +288,63 @@ def load_course_targets(file_path: str = "list.json", ui: Optional[ConsoleUI] =
     return normalized
 
 
+_high_res_timer_enabled = False
+
+
+def enable_high_res_timer():
+    """Windows 默认计时器粒度约 15.6ms，抢课前将其提升至 1ms（退出时恢复）。"""
+    global _high_res_timer_enabled
+    if _high_res_timer_enabled or os.name != 'nt':
+        return
+    try:
+        import ctypes
+        winmm = ctypes.windll.winmm
+        if winmm.timeBeginPeriod(1) == 0:
+            atexit.register(winmm.timeEndPeriod, 1)
+            _high_res_timer_enabled = True
+    except Exception:
+        pass
+
+
+def wait_until_precise(fire_ts: float, spin: float = 0.005):
+    """等待至本地时间戳 fire_ts：粗等待交给 Event.wait，最后 spin 秒用 perf_counter 忙等。"""
+    deadline = time.perf_counter() + (fire_ts - time.time())
+    coarse = deadline - time.perf_counter() - spin
+    if coarse > 0:
+        threading.Event().wait(coarse)
+    while time.perf_counter() < deadline:
+        pass
+
+
+def sleep_until(target_dt: datetime, label: str, print_every: float = 5.0,
+                sync_every: Optional[float] = None):
+    """长时间等待至 target_dt：每个显示周期只唤醒一次，可选每 sync_every 秒打印系统时间。"""
+    waiter = threading.Event()
+    last_sync = time.monotonic()
+    while True:
+        remaining = (target_dt - datetime.now()).total_seconds()
+        if remaining <= 0:
+            break
+        if sync_every and time.monotonic() - last_sync >= sync_every:
+            print(f"\r系统时间同步: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}     ")
+            last_sync = time.monotonic()
+        else:
+            print(f"\r{label} {int(remaining)} 秒...  ", end='', flush=True)
+        waiter.wait(min(print_every, remaining))
+    print()
+
+
+def poll_backoff(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter 退避：在 [0, min(cap, base * 2^attempt)] 内均匀取值，打散并发轮询的节奏。"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def prewarm_executor(executor: ThreadPoolExecutor, workers: int, timeout: float = 2.0):
+    """提前拉起线程池的全部工作线程：各任务在屏障处汇合，保证每个任务占用一个独立线程。"""
+    barrier = threading.Barrier(workers)
+    wait([executor.submit(barrier.wait, timeout) for _ in range(workers)], timeout=timeout + 1.0)
+
+
 def clear_screen():
     """清屏以避免刷屏输出。"""
     try:
@@ -163,6 +358,43 @@ class AHUCourseSelector:
     
     BASE_URL = "https://jw.ahu.edu.cn"
     API_BASE = f"{BASE_URL}/course-selection-api/api/v1/student/course-select"
+    PREDICATE_URL = f"{API_BASE}/add-predicate"
+    REQUEST_URL = f"{API_BASE}/add-request"
+    POOL_SIZE = 32  # 单主机连接池大小，覆盖轮询突发
+    REQUEST_TIMEOUT = 5.0  # 未显式指定时的默认超时，秒
+    # query-lesson 请求体模板（只读），键顺序与浏览器一致；前 7 个键每次调用填充
+    _QUERY_TEMPLATE: Dict[str, Any] = {
+        "turnId": None,
+        "studentId": None,
+        "semesterId": None,
+        "pageNo": None,
+        "pageSize": None,
+        "courseId": None,
+        "courseNameOrCode": None,
+        "lessonNameOrCode": "",
+        "teacherNameOrCode": "",
+        "week": "",
+        "grade": "",
+        "departmentId": "",
+        "majorId": "",
+        "adminclassId": "",
+        "campusId": "",
+        "openDepartmentId": "",
+        "courseTypeId": "",
+        "coursePropertyId": "",
+        "courseTaxonId": "",
+        "courseOwnershipId": "",
+        "canSelect": 1,
+        "_canSelect": "",
+        "creditGte": None,
+        "creditLte": None,
+        "hasCount": None,
+        "ids": None,
+        "substitutedCourseId": None,
+        "courseSubstitutePoolId": None,
+        "sortField": "lesson",
+        "sortType": "ASC",
+    }
     
     def __init__(self, token: Optional[str] = None, student_id: Optional[str] = None, ui: Optional[ConsoleUI] = None):
         """
@@ -173,12 +405,23 @@ class AHUCourseSelector:
             student_id: 学生ID (cs-course-select-student-id)
         """
         self.session = requests.Session()
+        self._pool_size = 0
+        self._mount_pool(self.POOL_SIZE)
         self.token = token
         self.student_id = student_id
+        self._student_id_int: Optional[int] = None  # 请求体中使用的整数学号，随认证信息更新
         self.turn_id = None  # 选课批次ID
         self.semester_id = None  # 学期ID
-        self.log_path = Path(__file__).resolve().parent / "query.log"
+        self._payload_cache: Dict[Tuple[Any, ...], bytes] = {}  # 已序列化的选课请求体
+        self.log_path = BASE_DIR / "query.log"
+        self._log_fh = None  # 延迟打开的持久日志句柄
+        self._log_lock = threading.Lock()  # 并发抢课线程共用同一句柄
+        self._transport = threading.local()  # 每个抢课线程记录本轮是否出现传输层失败
+        if not LOG_ENABLED:
+            # 关闭日志时直接替换为空操作，热路径上不做任何序列化
+            self._log_query = lambda *args, **kwargs: None
         self.ui = ui or ConsoleUI()
+        self._cache_api_headers()
         
         # 设置默认请求头
         self.session.headers.update({
@@ -187,11 +430,31 @@ class AHUCourseSelector:
             'Accept-Language': 'zh-CN,zh;q=0.9',
             'Referer': f'{self.BASE_URL}/course-selection/',
             'Origin': self.BASE_URL,
+            'Connection': 'keep-alive',
         })
         
         if token and student_id:
             self._update_auth(token, student_id)
 
+    def _mount_pool(self, size: int):
+        """挂载指定大小的长连接池；仅对建连失败重试（请求未发出，POST 也安全）。"""
+        adapter = HTTPAdapter(
+            pool_connections=size,
+            pool_maxsize=size,
+            pool_block=False,
+            max_retries=Retry(total=2, connect=2, read=0, status=0, redirect=0, backoff_factor=0),
+        )
+        old = self.session.adapters.get('https://')
+        self.session.mount('https://', adapter)
+        if old is not None:
+            old.close()
+        self._pool_size = size
+
+    def ensure_pool_size(self, size: int):
+        """连接池小于 size 时扩容，保证每个并发线程都能拿到空闲长连接。"""
+        if size > self._pool_size:
+            self._mount_pool(size)
+
     # 输出包装，保持统一风格
     def _info(self, text: str):
         self.ui.info(text)
@@ -205,12 +468,7 @@ class AHUCourseSelector:
     def _error(self, text: str):
         self.ui.error(text)
 
-    @staticmethod
-    def _is_duplicate_message(message: str) -> bool:
-        """检测是否为“相同教学班只能选一次”类提示。"""
-        if not message:
-            return False
-        return any(keyword in message for keyword in ["相同教学班只能选一次", "Duplicate lessons are not allowed"])
+    _is_duplicate_message = staticmethod(is_duplicate_message)
 
     @staticmethod
     def _extract_text_field(obj: Any) -> str:
@@ -223,6 +481,7 @@ class AHUCourseSelector:
     
     def _update_auth(self, token: str, student_id: str):
         """更新认证信息"""
+        self._student_id_int = int(student_id)
         self.token = token
         self.student_id = student_id
         
@@ -230,10 +489,11 @@ class AHUCourseSelector:
         self.session.cookies.set('cs-course-select-student-token', token, domain='jw.ahu.edu.cn')
         self.session.cookies.set('cs-course-select-student-id', student_id, domain='jw.ahu.edu.cn')
         self.session.headers.update({'Authorization': token})
+        self._cache_api_headers()
 
-    def _build_api_headers(self) -> Dict[str, str]:
-        """构造与浏览器一致的 API 头部。"""
-        return {
+    def _cache_api_headers(self):
+        """按当前 token 构造与浏览器一致的 API 头部并缓存，避免每次请求重建。"""
+        self._api_headers: Dict[str, str] = {
             'Authorization': self.token or '',
             'content-type': 'application/json',
             'contenttype': 'application/json',  # 与 HAR 一致
@@ -242,16 +502,29 @@ class AHUCourseSelector:
             'Referer': f'{self.BASE_URL}/course-selection/',
         }
 
-    def _post_json(self, url: str, payload: Dict[str, Any], label: str = "", timeout: float = 5.0) -> Optional[Dict[str, Any]]:
-        """统一的 POST JSON 请求，带日志，支持超时。"""
-        headers = self._build_api_headers()
-        self._log_query(label or "post_request", {"url": url, "payload": payload, "headers": headers})
-        resp = self.session.post(url, json=payload, headers=headers, timeout=timeout)
+    def _post_json(self, url: str, payload: Union[Dict[str, Any], bytes], label: str = "", timeout: float = REQUEST_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """统一的 POST JSON 请求，带日志，支持超时；payload 可为已序列化的 bytes。"""
+        if isinstance(payload, bytes):
+            body = payload
+            self._log_query(label or "post_request", {"url": url, "payload": payload.decode("utf-8"), "headers": self._api_headers})
+        else:
+            body = _jdumps(payload)
+            self._log_query(label or "post_request", {"url": url, "payload": payload, "headers": self._api_headers})
+        resp = self.session.post(url, data=body, headers=self._api_headers, timeout=timeout)
+        if resp.status_code in (401, 403):
+            raise UnrecoverableSelectionError(f"凭证无效或已过期 (HTTP {resp.status_code})")
         resp.raise_for_status()
-        data = resp.json()
+        data = _jloads(resp.content)
         self._log_query(label or "post_response", data)
         return data
 
+    def prime_connection(self, timeout: float = 3.0):
+        """预先建立到服务器的 TLS 连接，使首个抢课请求落在已握手的连接上。"""
+        try:
+            self.session.head(self.BASE_URL, timeout=timeout)
+        except Exception as exc:
+            self._warn(f"预建连接失败: {exc}")
+
     def warmup_course_page(self):
         """访问一次课程选择页，确保与浏览器一致的 referer/cookie 场景。"""
         if not self.student_id or not self.turn_id:
@@ -265,7 +538,7 @@ class AHUCourseSelector:
                 'Referer': f'{self.BASE_URL}/course-selection/',
             }
             self._log_query("warmup_request", {"url": url, "headers": headers})
-            resp = self.session.get(url, headers=headers)
+            resp = self.session.get(url, headers=headers, timeout=self.REQUEST_TIMEOUT)
             self._log_query("warmup_response", {"status": resp.status_code})
         except Exception as exc:
             self._warn(f"预热访问失败: {exc}")
@@ -281,8 +554,8 @@ class AHUCourseSelector:
             是否成功加载
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                creds = json.load(f)
+            with open(filepath, 'rb') as f:
+                creds = _jloads(f.read())
                 self._update_auth(creds['token'], creds['student_id'])
                 self._success(f"已加载凭证: student_id={self.student_id}")
                 return True
@@ -322,9 +595,9 @@ class AHUCourseSelector:
         url = f"{self.API_BASE}/{self.student_id}/turn/741/select"
         
         try:
-            resp = self.session.get(url)
+            resp = self.session.get(url, timeout=self.REQUEST_TIMEOUT)
             resp.raise_for_status()
-            data = resp.json()
+            data = _jloads(resp.content)
             
             if data.get('result') == 0 and data.get('data'):
                 turn_data = data['data']
@@ -360,9 +633,9 @@ class AHUCourseSelector:
         url = f"{self.API_BASE}/selected-lessons/{self.turn_id}/{self.student_id}"
         
         try:
-            resp = self.session.get(url)
+            resp = self.session.get(url, timeout=self.REQUEST_TIMEOUT)
             resp.raise_for_status()
-            data = resp.json()
+            data = _jloads(resp.content)
             
             if data.get('result') == 0 and data.get('data'):
                 courses = data['data']
@@ -380,7 +653,8 @@ class AHUCourseSelector:
                       course_id: Optional[int] = None,
                       course_name: str = "",
                       page_no: int = 1,
-                      page_size: int = 20) -> Dict[str, Any]:
+                      page_size: int = 20,
+                      suppress_log: bool = False) -> Dict[str, Any]:
         """
         查询课程列表
         
@@ -389,6 +663,7 @@ class AHUCourseSelector:
             course_name: 课程名称关键词
             page_no: 页码
             page_size: 每页数量
+            suppress_log: 不输出查询结果/错误（后台并行调用时避免与其它输出交错）
             
         Returns:
             包含lessons和pageInfo的字典
@@ -408,36 +683,14 @@ class AHUCourseSelector:
             course_id_payload = int(course_id)
         
         payload = {
+            **self._QUERY_TEMPLATE,
             "turnId": self.turn_id,
-            "studentId": int(self.student_id),
+            "studentId": self._student_id_int,
             "semesterId": self.semester_id,
             "pageNo": page_no,
             "pageSize": page_size,
             "courseId": course_id_payload,
             "courseNameOrCode": course_name,
-            "lessonNameOrCode": "",
-            "teacherNameOrCode": "",
-            "week": "",
-            "grade": "",
-            "departmentId": "",
-            "majorId": "",
-            "adminclassId": "",
-            "campusId": "",
-            "openDepartmentId": "",
-            "courseTypeId": "",
-            "coursePropertyId": "",
-            "courseTaxonId": "",
-            "courseOwnershipId": "",
-            "canSelect": 1,
-            "_canSelect": "",
-            "creditGte": None,
-            "creditLte": None,
-            "hasCount": None,
-            "ids": None,
-            "substitutedCourseId": None,
-            "courseSubstitutePoolId": None,
-            "sortField": "lesson",
-            "sortType": "ASC"
         }
         
         try:
@@ -448,14 +701,17 @@ class AHUCourseSelector:
                 lessons = result.get('lessons', [])
                 page_info = result.get('pageInfo', {})
 
-                self._success(f"查询到 {len(lessons)} 门课程 (共 {page_info.get('totalRows', 0)} 门)")
+                if not suppress_log:
+                    self._success(f"查询到 {len(lessons)} 门课程 (共 {page_info.get('totalRows', 0)} 门)")
                 return result
             else:
-                self._error(f"查询课程失败: {data.get('message', 'unknown error')}")
+                if not suppress_log:
+                    self._error(f"查询课程失败: {data.get('message', 'unknown error')}")
                 return {'lessons': [], 'pageInfo': {}}
                 
         except Exception as e:
-            self._error(f"请求失败: {e}")
+            if not suppress_log:
+                self._error(f"请求失败: {e}")
             return {'lessons': [], 'pageInfo': {}}
     
     def filter_lessons(self, lessons: List[Dict], filter_obj: CourseFilter) -> List[Dict]:
@@ -469,65 +725,39 @@ class AHUCourseSelector:
         Returns:
             符合条件的课程列表
         """
-        result = []
-        
-        for lesson in lessons:
-            # 课程名称匹配
-            if filter_obj.course_name:
-                course_name = lesson.get('course', {}).get('nameZh', '')
-                if filter_obj.course_name not in course_name:
-                    continue
-            
-            # 时间地点文本
-            date_time_place = lesson.get('dateTimePlace', {}).get('textZh', '')
-            
-            # 周次匹配
-            if filter_obj.weeks:
-                if filter_obj.weeks not in date_time_place:
-                    continue
-            
-            # 星期匹配
-            if filter_obj.weekday > 0:
-                weekday_map = {1: '星期一', 2: '星期二', 3: '星期三', 4: '星期四', 5: '星期五', 6: '星期六', 7: '星期日'}
-                if weekday_map.get(filter_obj.weekday, '') not in date_time_place:
-                    continue
-            
-            # 节次匹配
-            if filter_obj.start_unit > 0 and filter_obj.end_unit > 0:
-                unit_pattern = f"{filter_obj.start_unit}~{filter_obj.end_unit}节"
-                if unit_pattern not in date_time_place:
-                    continue
-            
-            # 校区匹配
-            if filter_obj.campus and filter_obj.campus not in date_time_place:
-                continue
-            
-            # 教室匹配
-            if filter_obj.building and filter_obj.building not in date_time_place:
-                continue
-            
-            result.append(lesson)
-        
-        return result
-    
+        return list(self.filter_lessons_iter(lessons, filter_obj))
+
+    def filter_lessons_iter(self, lessons: Iterable[Dict], filter_obj: CourseFilter) -> Iterator[Dict]:
+        """按条件逐个产出匹配的课程，只需首个结果时可提前结束扫描"""
+        return filter(compile_filter(filter_obj), lessons)
+
+    def _selection_payload(self, lesson_id: int, virtual_cost: Optional[int]) -> bytes:
+        """add-predicate / add-request 共用的请求体，按 (学号, 批次, 课程, virtualCost) 缓存序列化结果。"""
+        key = (self._student_id_int, self.turn_id, lesson_id, virtual_cost)
+        body = self._payload_cache.get(key)
+        if body is None:
+            body = _jdumps({
+                "studentAssoc": self._student_id_int,
+                "courseSelectTurnAssoc": self.turn_id,
+                "requestMiddleDtos": [
+                    {
+                        "lessonAssoc": lesson_id,
+                        "virtualCost": virtual_cost
+                    }
+                ],
+                "coursePackAssoc": None
+            })
+            self._payload_cache[key] = body
+        return body
+
     def add_course_predicate(self, lesson_id: int, virtual_cost: int = 0, timeout: float = 5.0, suppress_log: bool = False) -> Optional[str]:
         """提交选课预检请求（按浏览器 HAR 头部发送）。"""
         if not self.turn_id or not self.student_id:
             if not self.get_turn_info():
                 return None
         
-        url = f"{self.API_BASE}/add-predicate"
-        payload = {
-            "studentAssoc": int(self.student_id),
-            "courseSelectTurnAssoc": self.turn_id,
-            "requestMiddleDtos": [
-                {
-                    "lessonAssoc": lesson_id,
-                    "virtualCost": virtual_cost
-                }
-            ],
-            "coursePackAssoc": None
-        }
+        url = self.PREDICATE_URL
+        payload = self._selection_payload(lesson_id, virtual_cost)
         
         try:
             data = self._post_json(url, payload, label="add_predicate", timeout=timeout)
@@ -541,7 +771,10 @@ class AHUCourseSelector:
                     self._error(f"提交选课失败: {data.get('message', 'unknown error')}")
                 return None
                 
+        except UnrecoverableSelectionError:
+            raise
         except Exception as e:
+            self._note_failure(e)
             if not suppress_log:
                 self._error(f"请求失败: {e}")
             return None
@@ -552,18 +785,8 @@ class AHUCourseSelector:
             if not self.get_turn_info():
                 return None
 
-        url = f"{self.API_BASE}/add-request"
-        payload = {
-            "studentAssoc": int(self.student_id),
-            "courseSelectTurnAssoc": self.turn_id,
-            "requestMiddleDtos": [
-                {
-                    "lessonAssoc": lesson_id,
-                    "virtualCost": virtual_cost
-                }
-            ],
-            "coursePackAssoc": None
-        }
+        url = self.REQUEST_URL
+        payload = self._selection_payload(lesson_id, virtual_cost)
 
         try:
             data = self._post_json(url, payload, label="add_request", timeout=timeout)
@@ -576,18 +799,24 @@ class AHUCourseSelector:
                 if not suppress_log:
                     self._error(f"提交正式选课失败: {data.get('message', 'unknown error')}")
                 return None
+        except UnrecoverableSelectionError:
+            raise
         except Exception as e:
+            self._note_failure(e)
             if not suppress_log:
                 self._error(f"请求失败: {e}")
             return None
     
-    def get_predicate_response(self, request_id: str, max_retries: int = 10, poll_interval: float = 0.2, timeout: float = 5.0, suppress_log: bool = False) -> Optional[Dict]:
+    def get_predicate_response(self, request_id: str, max_retries: int = 10, poll_interval: float = 0.2, timeout: float = 5.0, suppress_log: bool = False,
+                               initial_poll_interval: float = 0.02) -> Optional[Dict]:
         """
         轮询选课预检结果
         
         Args:
             request_id: 请求ID
             max_retries: 最大重试次数
+            poll_interval: 轮询间隔上限（秒）
+            initial_poll_interval: 退避基数，间隔上界按 2 的幂增长至 poll_interval（full jitter）
             
         Returns:
             选课结果
@@ -602,7 +831,8 @@ class AHUCourseSelector:
             try:
                 resp = self.session.get(url, timeout=timeout)
                 resp.raise_for_status()
-                data = resp.json()
+                self._transport.failed = False  # 轮询恢复应答，之前的传输失败不再算作本轮结果
+                data = _jloads(resp.content)
                 # 记录轮询结果便于排查
                 self._log_query("predicate_response_poll", {"request_id": request_id, "round": i+1, "data": data})
                 
@@ -625,7 +855,7 @@ class AHUCourseSelector:
                         if i < max_retries - 1:
                             if not suppress_log:
                                 self._info(f"等待结果... ({i+1}/{max_retries})")
-                            time.sleep(poll_interval)
+                            time.sleep(poll_backoff(i, initial_poll_interval, poll_interval))
                         continue
                 else:
                     if not suppress_log:
@@ -633,10 +863,11 @@ class AHUCourseSelector:
                     return None
                     
             except Exception as e:
+                self._note_failure(e)
                 if not suppress_log:
                     self._error(f"请求失败: {e}")
                 if i < max_retries - 1:
-                    time.sleep(poll_interval)
+                    time.sleep(poll_backoff(i, initial_poll_interval, poll_interval))
                     continue
                 return None
         
@@ -644,8 +875,9 @@ class AHUCourseSelector:
             self._error("超过最大重试次数")
         return None
 
-    def get_add_drop_response(self, request_id: str, max_retries: int = 10, poll_interval: float = 0.2, timeout: float = 5.0, suppress_log: bool = False) -> Optional[Dict]:
-        """轮询正式选课结果（add-drop-response）。"""
+    def get_add_drop_response(self, request_id: str, max_retries: int = 10, poll_interval: float = 0.2, timeout: float = 5.0, suppress_log: bool = False,
+                              initial_poll_interval: float = 0.02) -> Optional[Dict]:
+        """轮询正式选课结果（add-drop-response），间隔按 full-jitter 从 initial_poll_interval 退避至 poll_interval。"""
         if not self.student_id:
             self._error("未设置 student_id")
             return None
@@ -656,7 +888,8 @@ class AHUCourseSelector:
             try:
                 resp = self.session.get(url, timeout=timeout)
                 resp.raise_for_status()
-                data = resp.json()
+                self._transport.failed = False  # 轮询恢复应答，之前的传输失败不再算作本轮结果
+                data = _jloads(resp.content)
                 self._log_query("add_drop_response_poll", {"request_id": request_id, "round": i + 1, "data": data})
 
                 if data.get('result') == 0:
@@ -678,17 +911,18 @@ class AHUCourseSelector:
                         return result
 
                     if i < max_retries - 1:
-                        time.sleep(poll_interval)
+                        time.sleep(poll_backoff(i, initial_poll_interval, poll_interval))
                     continue
                 else:
                     if not suppress_log:
                         self._error(f"查询失败: {data.get('message', 'unknown error')}")
                     return None
             except Exception as e:
+                self._note_failure(e)
                 if not suppress_log:
                     self._error(f"请求失败: {e}")
                 if i < max_retries - 1:
-                    time.sleep(poll_interval)
+                    time.sleep(poll_backoff(i, initial_poll_interval, poll_interval))
                     continue
                 return None
 
@@ -700,7 +934,7 @@ class AHUCourseSelector:
         """将查询相关内容追加到日志文件，单行压缩并截断，避免日志膨胀。"""
         def _as_json_line(obj: Any) -> str:
             try:
-                text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+                text = _jdumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
             except Exception:
                 text = str(obj)
             max_len = 1200  # 单条日志最长字符数
@@ -710,75 +944,155 @@ class AHUCourseSelector:
 
         try:
             line = f"[{datetime.now().isoformat()}] {label} " + _as_json_line(content)
-            with self.log_path.open("a", encoding="utf-8") as f:
-                f.write(line)
-                f.write("\n")
+            with self._log_lock:
+                if self._log_fh is None:
+                    self._log_fh = self.log_path.open("a", encoding="utf-8", buffering=1 << 16)
+                    atexit.register(self._log_fh.close)
+                self._log_fh.write(line + "\n")
         except Exception as exc:
             self._warn(f"无法写入日志: {exc}")
+
+    def flush_log(self):
+        """将日志缓冲写入磁盘；长时间等待前与抢课结束后调用，窗口被直接关闭时不丢失日志尾部。"""
+        with self._log_lock:
+            if self._log_fh is not None:
+                try:
+                    self._log_fh.flush()
+                except Exception as exc:
+                    self._warn(f"无法写入日志: {exc}")
+
+    @contextmanager
+    def _flushing_log(self):
+        """退出时刷新日志缓冲（置于线程池之前，使其在线程池收尾后执行）。"""
+        try:
+            yield
+        finally:
+            self.flush_log()
     
-    def force_send_requests(self, lesson_id: int, attempts: int = 10, interval: float = 0.25, request_timeout: float = 5.0) -> bool:
+    def _note_failure(self, exc: BaseException):
+        """请求异常被吞掉前记录是否属于传输层失败，供 _attempt_once 汇报。"""
+        if is_transport_failure(exc):
+            self._transport.failed = True
+
+    def _attempt_once(self, lesson_id: int, request_timeout: float = 5.0,
+                      predicate_retries: int = 16, predicate_poll_interval: float = 0.15,
+                      predicate_ok: Optional[threading.Event] = None,
+                      stop: Optional[threading.Event] = None) -> Tuple[bool, str, bool]:
         """
-        强制重复发送选课预检请求若干次（用于重试抢课）
-        如果任意一次返回成功则立即返回 True。
+        执行一轮 预检→查询→正式提交→查询，返回 (是否成功/已选过, 状态文本, 是否因传输层失败而未得到答复)。
+        时间冲突、凭证失效等重试无意义的错误抛出 UnrecoverableSelectionError。
+        传入 predicate_ok 时：已置位则跳过预检直接正式提交，预检通过后将其置位。
+        传入 stop 时：已置位则不再发起正式提交（其它备选课程已成功）。
         """
-        self._info(f"强制发送请求: lessonId={lesson_id}, attempts={attempts}, interval={interval}s")
+        self._transport.failed = False
+        ok, msg = self._attempt_chain(lesson_id, request_timeout, predicate_retries, predicate_poll_interval, predicate_ok, stop)
+        return ok, msg, not ok and self._transport.failed
+
+    def _attempt_chain(self, lesson_id: int, request_timeout: float, predicate_retries: int,
+                       predicate_poll_interval: float, predicate_ok: Optional[threading.Event],
+                       stop: Optional[threading.Event]) -> Tuple[bool, str]:
+        """_attempt_once 的流程主体，返回 (是否成功/已选过, 状态文本)。"""
+        try:
+            if predicate_ok is None or not predicate_ok.is_set():
+                req_id = self.add_course_predicate(lesson_id, virtual_cost=0, timeout=request_timeout, suppress_log=True)
+                if not req_id:
+                    return False, "无 request_id"
+
+                pred = self.get_predicate_response(req_id, max_retries=predicate_retries, poll_interval=predicate_poll_interval, timeout=request_timeout, suppress_log=True)
+                if not pred or not pred.get('success'):
+                    err = self._extract_text_field(pred.get('errorMessage') if pred else None) or '无结果'
+                    if self._is_duplicate_message(err):
+                        return True, "已选过 (预检)"
+                    if '时间冲突' in err:
+                        raise UnrecoverableSelectionError(f"预检: {err}")
+                    return False, f"预检失败 {err}"
+
+                # 预检结果中的 result map 也可能提示已选过
+                pred_map = pred.get('result') or _EMPTY
+                for v in pred_map.values():
+                    if isinstance(v, dict) and self._is_duplicate_message(v.get('text', '')):
+                        return True, "已选过 (预检结果)"
+                if predicate_ok is not None:
+                    predicate_ok.set()
+
+            if stop is not None and stop.is_set():
+                return False, "已停止"
+            add_req_id = self.add_course_request(lesson_id, virtual_cost=None, timeout=request_timeout, suppress_log=True)
+            if not add_req_id:
+                return False, "无 add-request id"
+
+            final = self.get_add_drop_response(add_req_id, max_retries=20, poll_interval=0.2, timeout=request_timeout, suppress_log=True)
+            if final and final.get('success'):
+                return True, "正式成功"
+            err = self._extract_text_field(final.get('errorMessage') if final else None) or '无最终结果'
+            if '时间冲突' in err:
+                raise UnrecoverableSelectionError(err)
+            if self._is_duplicate_message(err) or (final and final.get('duplicate')):
+                return True, "已选过 (add-drop)"
+            return False, f"正式失败 {err}"
+        except UnrecoverableSelectionError:
+            raise
+        except Exception as exc:
+            self._note_failure(exc)
+            return False, f"异常 {str(exc)[:80]}"
+
+    def force_send_requests(self, lesson_ids: Iterable[int], attempts: int = 10, interval: float = 0.25, request_timeout: float = 5.0) -> bool:
+        """
+        对若干备选课程并发强制重复发送选课请求（用于重试抢课）
+        每门课程各自重复 attempts 轮完整流程，任意课程成功即置位 stop 阻止其余课程正式提交，
+        不等待仍在轮询的任务，直接返回 True。
+        """
+        lesson_ids = list(lesson_ids)
+        if not lesson_ids:
+            return False
+        self._info(f"强制发送请求: lessonId={','.join(map(str, lesson_ids))}, attempts={attempts}, interval={interval}s")
         last_error = None
-        status_line = ""
+        self.prime_connection()
 
-        def update_status(text: str):
-            nonlocal status_line
-            if text == status_line:
-                return
-            clear = " " * max(len(status_line), len(text))
-            print(f"\r{clear}\r{text}", end='', flush=True)
-            status_line = text
-
-        for i in range(1, attempts + 1):
-            request_id = self.add_course_predicate(lesson_id, virtual_cost=0, timeout=request_timeout, suppress_log=True)
-            if not request_id:
-                last_error = "未能获取 request_id"
-                update_status(f"第{i}/{attempts}: 未获取request_id")
-                time.sleep(interval)
-                continue
-            result = self.get_predicate_response(request_id, max_retries=3, timeout=request_timeout, suppress_log=True)
-            if result:
-                if result.get('success'):
-                    pred_map = result.get('result') or {}
-                    for v in pred_map.values():
-                        if isinstance(v, dict) and self._is_duplicate_message(v.get('text', '')):
-                            update_status(f"第{i}/{attempts}: 已选过")
-                            print()
-                            return True
-                    add_request_id = self.add_course_request(lesson_id, virtual_cost=None, timeout=request_timeout, suppress_log=True)
-                    if not add_request_id:
-                        last_error = "未能获取 add-request request_id"
-                        update_status(f"第{i}/{attempts}: 无 add-request id")
-                        time.sleep(interval)
-                        continue
-                    final = self.get_add_drop_response(add_request_id, max_retries=10, poll_interval=0.2, timeout=request_timeout, suppress_log=True)
-                    if final and final.get('success'):
-                        update_status(f"第{i}/{attempts}: 成功")
-                        print()
-                        return True
-                    if self._is_duplicate_message((final or {}).get('errorMessage', {}).get('text', '')) or (final or {}).get('duplicate'):
-                        update_status(f"第{i}/{attempts}: 已选过")
-                        print()
-                        return True
-                    msg = (final or {}).get('errorMessage') or (final or {}).get('message') or '无详细信息'
-                    last_error = msg
-                    update_status(f"第{i}/{attempts}: {self._extract_text_field(msg)}")
-                else:
-                    msg = result.get('errorMessage') or result.get('message') or '无详细信息'
-                    if self._is_duplicate_message(msg if isinstance(msg, str) else msg.get('text', '')):
-                        update_status(f"第{i}/{attempts}: 已选过")
-                        print()
+        stop = threading.Event()  # 任一课程成功后置位，其余课程不再开始新一轮或正式提交
+
+        def retry_delay(attempt: int) -> float:
+            # 前两次重试间隔约 50ms，之后几何退避至 interval
+            return min(interval, 0.05 * 2 ** max(0, attempt - 2))
+
+        def attempt(lesson_id: int, delay: float) -> Tuple[int, bool, str, bool]:
+            if delay > 0:
+                stop.wait(delay)
+            # 流水线中排队或退避中的下一轮：其它课程已成功则不再开始
+            if stop.is_set():
+                return lesson_id, False, "已停止", False
+            try:
+                ok, msg, _ = self._attempt_once(lesson_id, request_timeout, predicate_retries=8, predicate_poll_interval=0.2, stop=stop)
+            except UnrecoverableSelectionError as exc:
+                return lesson_id, False, f"放弃: {exc}", False
+            return lesson_id, ok, msg, True
+
+        status = StatusLine()
+        # 线程池在整个强制流程内复用；各课程独立流水线推进：
+        # 某门课程一轮结束即提交其下一轮，其轮询等待与其它课程的请求相互重叠
+        executor = ThreadPoolExecutor(max_workers=min(8, len(lesson_ids)))
+        try:
+            rounds = dict.fromkeys(lesson_ids, 1)
+            pending = {executor.submit(attempt, lesson_id, 0.0) for lesson_id in lesson_ids}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    lesson_id, ok, msg, retryable = fut.result()
+                    i = rounds[lesson_id]
+                    status.update(f"第{i}/{attempts} lessonId={lesson_id}: {msg}")
+                    if ok:
+                        stop.set()
                         return True
                     last_error = msg
-                    update_status(f"第{i}/{attempts}: {self._extract_text_field(msg)}")
-            else:
-                update_status(f"第{i}/{attempts}: 查询失败")
-            time.sleep(interval)
-        print()
+                    if retryable and i < attempts and not stop.is_set():
+                        rounds[lesson_id] = i + 1
+                        pending.add(executor.submit(attempt, lesson_id, retry_delay(i)))
+        finally:
+            # 成功时不等待其余仍在轮询的任务：stop 已阻止其正式提交，排队任务直接取消
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            status.close()
+            self.flush_log()
         self._warn(f"所有尝试结束，最后错误: {last_error}")
         return False
     
@@ -801,7 +1115,7 @@ class AHUCourseSelector:
     def sync_time_with_ntp(self, ntp_server: str = 'ntp.aliyun.com') -> float:
         """
         通过NTP服务器同步时间，返回时间偏移量（秒）
-        取三次测量的平均值以提高准确性
+        并发发出三次测量并取平均值以提高准确性
         
         Args:
             ntp_server: NTP服务器地址
@@ -809,20 +1123,28 @@ class AHUCourseSelector:
         Returns:
             本地时间与NTP服务器的时间差（秒），正数表示本地时间慢
         """
+        def probe() -> float:
+            response = ntplib.NTPClient().request(ntp_server, version=3, timeout=1)
+            return response.tx_time - time.time()
+
+        # 三次探测并发发出（NTP 为无状态 UDP），只收集窗口内返回的结果；
+        # 不等待窗口外的慢探测（socket 超时不覆盖 DNS 解析），线程池不阻塞关闭
         offsets = []
-        
-        for i in range(3):
-            try:
-                client = ntplib.NTPClient()
-                response = client.request(ntp_server, version=3, timeout=5)
-                ntp_time = response.tx_time
-                local_time = time.time()
-                offset = ntp_time - local_time
+        executor = ThreadPoolExecutor(max_workers=3)
+        futures = [executor.submit(probe) for _ in range(3)]
+        try:
+            for i, fut in enumerate(as_completed(futures, timeout=2), 1):
+                try:
+                    offset = fut.result()
+                except Exception as e:
+                    self._error(f"第 {i} 次NTP同步失败: {e}")
+                    continue
                 offsets.append(offset)
-                self._info(f"第 {i+1} 次测量: {offset:.3f} 秒")
-                time.sleep(0.5)  # 间隔0.5秒
-            except Exception as e:
-                self._error(f"第 {i+1} 次NTP同步失败: {e}")
+                self._info(f"第 {i} 次测量: {offset:.3f} 秒")
+        except FuturesTimeoutError:
+            self._warn(f"部分NTP探测超时，使用已返回的 {len(offsets)} 次结果")
+        finally:
+            executor.shutdown(wait=False)
         
         if offsets:
             avg_offset = sum(offsets) / len(offsets)
@@ -855,119 +1177,139 @@ class AHUCourseSelector:
         self._info(f"等待抢课时间: {target_time.strftime('%Y-%m-%d %H:%M:%S')}")
         self._info(f"将在 {start_time.strftime('%H:%M:%S')} 开始发起请求 (并发: {concurrency})")
 
+        # 按并发数两倍预留长连接，避免并发线程争抢连接或临时新建连接
+        self.ensure_pool_size(concurrency * 2)
+        # 倒计时前先把工作线程全部拉起，开抢瞬间不再现场创建线程
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        prewarm_executor(executor, concurrency)
+
         # 等待到开始时间（使用静态显示）
+        enable_high_res_timer()
+        self.flush_log()
+        start_ts = start_time.timestamp() - time_offset  # 本地时钟下的开始时刻，只换算一次
+        deadline_ts = deadline.timestamp() - time_offset
         last_print_time = time.time()
+        primed = False
         while True:
-            current_time = time.time() + time_offset
-            current_dt = datetime.fromtimestamp(current_time)
-            
-            if current_dt >= start_time:
+            now = time.time()
+            remaining = start_ts - now
+            if not primed and remaining <= 2.0:
+                # 起跑前 1~2 秒预建连接（粗等待每轮至多 1 秒，必然落在该区间）：
+                # 放在精确等待之前，握手往返不占用起跑时刻
+                primed = True
+                if remaining > 0.1:
+                    self.prime_connection(timeout=min(1.0, remaining - 0.05))
+                    continue
+            if remaining <= 0.05:
+                # 最后一段交给精确等待，避免 sleep 粒度造成的起跑抖动
+                wait_until_precise(start_ts)
                 break
             
-            remaining = (start_time - current_dt).total_seconds()
-            
             # 每秒更新一次，避免刷屏
-            if time.time() - last_print_time >= 1.0:
+            if now - last_print_time >= 1.0:
                 print(f"\r距离开始还有 {int(remaining)} 秒...  ", end='', flush=True)
-                last_print_time = time.time()
+                last_print_time = now
             
-            time.sleep(0.1)
+            # 粗等待：至多睡到下一次状态输出，且不越过最后 50ms
+            time.sleep(min(remaining - 0.05, 1.0))
         
         print("\n")
         self._info("开始抢课 (并发请求)")
         print()
 
-        def _single_attempt(attempt_idx: int):
-            try:
-                req_id = self.add_course_predicate(lesson_id, virtual_cost=0, timeout=request_timeout, suppress_log=True)
-                if not req_id:
-                    return False, f"尝试{attempt_idx}: 无 request_id"
+        # 任一尝试预检通过后，其余尝试跳过预检直接正式提交；每 10 秒清除一次以重新验证预检结果
+        predicate_ok = threading.Event()
 
-                pred = self.get_predicate_response(req_id, max_retries=8, poll_interval=0.15, timeout=request_timeout, suppress_log=True)
-                if not pred or not pred.get('success'):
-                    err = self._extract_text_field((pred or {}).get('errorMessage') if pred else '') or '无结果'
-                    if self._is_duplicate_message(err):
-                        return True, f"尝试{attempt_idx}: 已选过 (预检)"
-                    return False, f"尝试{attempt_idx}: 预检失败 {err}"
-
-                # 预检结果中的 result map 也可能提示已选过
-                pred_map = pred.get('result') or {}
-                for v in pred_map.values():
-                    if isinstance(v, dict) and self._is_duplicate_message(v.get('text', '')):
-                        return True, f"尝试{attempt_idx}: 已选过 (预检结果)"
-
-                add_req_id = self.add_course_request(lesson_id, virtual_cost=None, timeout=request_timeout, suppress_log=True)
-                if not add_req_id:
-                    return False, f"尝试{attempt_idx}: 无 add-request id"
-
-                final = self.get_add_drop_response(add_req_id, max_retries=10, poll_interval=0.2, timeout=request_timeout, suppress_log=True)
-                if final and final.get('success'):
-                    return True, f"尝试{attempt_idx}: 正式成功"
-                err = self._extract_text_field((final or {}).get('errorMessage') if final else '') or '无最终结果'
-                if '时间冲突' in err:
-                    return False, f"尝试{attempt_idx}: 时间冲突"
-                if self._is_duplicate_message(err) or (final or {}).get('duplicate'):
-                    return True, f"尝试{attempt_idx}: 已选过 (add-drop)"
-                return False, f"尝试{attempt_idx}: 正式失败 {err}"
-            except Exception as exc:
-                return False, f"尝试{attempt_idx}: 异常 {str(exc)[:80]}"
+        def _single_attempt(attempt_idx: int):
+            ok, msg, transport_failed = self._attempt_once(lesson_id, request_timeout, predicate_ok=predicate_ok)
+            return ok, f"尝试{attempt_idx}: {msg}", transport_failed
 
         attempt_counter = 0
         success = False
         last_error = None
 
-        status_line = ""
+        status = StatusLine()
+        done_q: SimpleQueue = SimpleQueue()
 
-        def update_status(text: str):
-            nonlocal status_line
-            if text == status_line:
-                return
-            clear = " " * max(len(status_line), len(text))
-            print(f"\r{clear}\r{text}", end='', flush=True)
-            status_line = text
+        # AIMD 并发控制：传输层失败（超时/连接失败/429/5xx）占多数时并发减半，恢复后逐个加回；
+        # 每次调整后清空样本，下次调整只依据调整之后的新结果
+        outcomes: deque = deque(maxlen=20)
+        min_samples = 4
+        target_conc = concurrency
+        next_adjust = time.monotonic() + 0.5
+        next_predicate_check = time.monotonic() + 10.0
 
-        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        with self._flushing_log(), executor:
             futures = set()
 
             try:
                 while True:
-                    current_dt = datetime.fromtimestamp(time.time() + time_offset)
-                    if current_dt > deadline:
-                        print()
+                    remaining = deadline_ts - time.time()
+                    if remaining < 0:
+                        status.close()
                         self._error(f"抢课超时 (已发起 {attempt_counter} 次)")
                         self._warn(f"最后错误: {last_error}")
                         return False
 
-                    # 补足并发槽位
-                    while len(futures) < concurrency:
+                    now_mono = time.monotonic()
+                    if len(outcomes) >= min_samples and now_mono >= next_adjust:
+                        reject_rate = sum(outcomes) / len(outcomes)
+                        if reject_rate > 0.5:
+                            target_conc = max(1, target_conc // 2)
+                        elif reject_rate < 0.1:
+                            target_conc = min(concurrency, target_conc + 1)
+                        outcomes.clear()
+                        next_adjust = now_mono + 0.5
+                    if now_mono >= next_predicate_check:
+                        predicate_ok.clear()
+                        next_predicate_check = now_mono + 10.0
+
+                    # 补足并发槽位；任务完成时由回调投递到完成队列
+                    while len(futures) < target_conc:
                         attempt_counter += 1
-                        futures.add(executor.submit(_single_attempt, attempt_counter))
-
-                    done, futures = wait(futures, return_when=FIRST_COMPLETED, timeout=0.05)
-                    for fut in done:
-                        ok, msg = fut.result()
-                        last_error = msg
-                        if ok:
-                            update_status(f"成功 {msg}")
-                            success = True
-                            break
-                        else:
-                            # 仅保留尝试次数与文本字段
-                            update_status(msg)
+                        fut = executor.submit(_single_attempt, attempt_counter)
+                        fut.add_done_callback(done_q.put)
+                        futures.add(fut)
+
+                    # 阻塞到任一任务完成即刻唤醒；超时上限 1 秒以便检查截止时间并响应 Ctrl+C
+                    try:
+                        fut = done_q.get(timeout=min(1.0, remaining))
+                    except Empty:
+                        continue
+                    futures.discard(fut)
+                    try:
+                        ok, msg, transport_failed = fut.result()
+                    except UnrecoverableSelectionError as exc:
+                        # 该课程重试无意义，立即放弃以便调用方转向下一目标
+                        for f in futures:
+                            f.cancel()
+                        status.close()
+                        self._warn(f"放弃该课程: {exc} (已发起 {attempt_counter} 次)")
+                        return False
+                    last_error = msg
+                    outcomes.append(transport_failed)
+                    if ok:
+                        status.update(f"成功 {msg}")
+                        success = True
+                    else:
+                        # 仅保留尝试次数与文本字段
+                        status.update(msg)
 
                     if success:
                         # 取消剩余未完成的任务，避免多余请求
                         for f in futures:
                             f.cancel()
-                            print()  # 换行结束状态行
-                            self._success(f"选课成功 (并发尝试次数: {attempt_counter})")
+                        status.close()  # 换行结束状态行
+                        self._success(f"选课成功 (并发尝试次数: {attempt_counter})")
                         return True
             except KeyboardInterrupt:
                 for f in futures:
                     f.cancel()
-                    print()
-                    self._warn("已中断抢课 (Ctrl+C)")
+                status.close()
+                self._warn("已中断抢课 (Ctrl+C)")
                 return False
+            finally:
+                status.close()
 
 def prompt_manual_credentials(client: AHUCourseSelector) -> bool:
     """手动输入 student_id 与 token，并立即保存"""
@@ -1074,6 +1416,7 @@ def find_target_lesson(client: AHUCourseSelector, target: Dict[str, Any]) -> Opt
     filter_obj: CourseFilter = target["filter"]
     course_name = filter_obj.course_name or ""
     course_id = target.get("course_id")
+    match = compile_filter(filter_obj)  # 跨页复用同一判定函数
 
     client.ui.step(f"查询课程: {course_name or '未命名课程'}")
     page_no = 1
@@ -1090,9 +1433,8 @@ def find_target_lesson(client: AHUCourseSelector, target: Dict[str, Any]) -> Opt
         page_info = result.get('pageInfo', {}) or {}
         total_pages = max(total_pages, int(page_info.get('totalPages') or 1))
 
-        filtered = client.filter_lessons(lessons, filter_obj)
-        if filtered:
-            lesson = filtered[0]
+        lesson = next(filter(match, lessons), None)
+        if lesson is not None:
             client._success(f"找到目标课程 (第 {page_no}/{total_pages} 页)")
             client.print_lesson_info(lesson)
             return lesson
@@ -1103,6 +1445,37 @@ def find_target_lesson(client: AHUCourseSelector, target: Dict[str, Any]) -> Opt
     return None
 
 
+def _warmup_top_target(client: AHUCourseSelector, target: Dict[str, Any]) -> Tuple[bool, str]:
+    """
+    对最高优先课程执行完整“搜索-预检-查询结果”流程，验证凭证与会话。
+    与 NTP 同步并行执行，过程不输出，返回 (是否通过, 结果说明) 由调用方统一打印。
+    """
+    try:
+        result = client.query_lessons(
+            course_id=target.get("course_id"),
+            course_name=target.get("name", ""),
+            page_no=1,
+            page_size=10,
+            suppress_log=True,
+        )
+        lessons = result.get("lessons", [])
+        warm_lesson = next(client.filter_lessons_iter(lessons, target["filter"]), None)
+        if warm_lesson is None:
+            return False, "预检: 未找到匹配课程，可能是筛选条件或时间段问题"
+        request_id = client.add_course_predicate(warm_lesson["id"], virtual_cost=0, suppress_log=True)
+        if not request_id:
+            return False, "预检: 提交失败"
+        pred = client.get_predicate_response(request_id, max_retries=1, suppress_log=True)
+        if pred is None:
+            return True, f"预检已提交 (requestId: {request_id})，暂无结果"
+        if pred.get('success'):
+            return True, "预检通过"
+        err = client._extract_text_field(pred.get('errorMessage')) or '未知错误'
+        return False, f"预检未通过: {err}"
+    except Exception as exc:
+        return False, f"预检流程失败: {exc}"
+
+
 def search_courses_interactive(client: AHUCourseSelector) -> List[Dict[str, Any]]:
     """按用户输入关键词搜索课程并选择，分页显示（每页10条），清屏翻页。"""
     selected: List[Dict[str, Any]] = []
@@ -1122,6 +1495,7 @@ def search_courses_interactive(client: AHUCourseSelector) -> List[Dict[str, Any]
         page_no = 1
         page_size = 200
         matches: List[Dict[str, Any]] = []
+        search = pattern.search
 
         while True:
             result = client.query_lessons(course_name=keyword, page_no=page_no, page_size=page_size)
@@ -1129,18 +1503,18 @@ def search_courses_interactive(client: AHUCourseSelector) -> List[Dict[str, Any]
             if not lessons:
                 break
             for lesson in lessons:
-                course = lesson.get('course', {})
-                text_fields = [
+                get = lesson.get
+                course = get('course') or _EMPTY
+                text_fields = (
                     course.get('nameZh', ''),
                     course.get('code', ''),
-                    lesson.get('name', ''),
-                    lesson.get('lessonCode', ''),
-                    lesson.get('dateTimePlace', {}).get('textZh', ''),
-                ]
-                teachers = lesson.get('teachers', [])
-                text_fields.extend([t.get('nameZh', '') for t in teachers])
+                    get('name', ''),
+                    get('lessonCode', ''),
+                    (get('dateTimePlace') or _EMPTY).get('textZh', ''),
+                    *(t.get('nameZh', '') for t in get('teachers') or ()),
+                )
                 combined = ' '.join([str(x or '') for x in text_fields])
-                if pattern.search(combined):
+                if search(combined):
                     matches.append(lesson)
 
             page_info = result.get('pageInfo', {}) or {}
@@ -1254,23 +1628,8 @@ def main():
         ui.info(f"将在 {verify_time.strftime('%H:%M:%S')} 验证凭证 (距离 {int(wait_seconds)} 秒)")
         
         # 等待到验证时间（静态显示），每3分钟同步一次系统时间
-        last_print = time.time()
-        last_sync = time.time()
-        while datetime.now() < verify_time:
-            remaining = (verify_time - datetime.now()).total_seconds()
-            
-            # 每3分钟同步一次系统时间
-            if time.time() - last_sync >= 180:  # 180秒 = 3分钟
-                sync_time = datetime.now()
-                print(f"\r系统时间同步: {sync_time.strftime('%Y-%m-%d %H:%M:%S')}     ")
-                last_sync = time.time()
-                last_print = time.time()
-            
-            if remaining > 0 and time.time() - last_print >= 5.0:  # 每5秒更新一次
-                print(f"\r距离验证还有 {int(remaining)} 秒...  ", end='', flush=True)
-                last_print = time.time()
-            time.sleep(1)
-        print()
+        client.flush_log()
+        sleep_until(verify_time, "距离验证还有", sync_every=180)
     
     # 验证凭证
     if not ensure_valid_credentials(client):
@@ -1345,15 +1704,16 @@ def main():
         return
     
     # 按优先级排序
-    lesson_targets.sort(key=lambda x: x["priority"])
+    lesson_targets.sort(key=itemgetter("priority"))
     
     ui.success(f"共找到 {len(lesson_targets)} 个目标课程")
     for i, target in enumerate(lesson_targets, 1):
         lesson = target["lesson"]
+        date_time_place = (lesson.get('dateTimePlace') or _EMPTY).get('textZh', '')
         ui.info(f"[{i}] {target['name']} - lessonId={lesson['id']}")
-        ui.info(f"      {lesson.get('dateTimePlace', {}).get('textZh', '')}")
+        ui.info(f"      {date_time_place}")
 
-    # 可选：对优先课程执行强制多次预检请求
+    # 可选：对优先课程（可含若干备选）执行强制多次预检请求
     try:
         force_choice = ui.question("是否对优先课程强制发送多次预检请求? (y/n)").lower()
     except Exception:
@@ -1365,10 +1725,17 @@ def main():
             attempts = int(default_attempts) if default_attempts else 10
         except Exception:
             attempts = 10
-        top = lesson_targets[0]
-        top_lesson = top['lesson']
-        ui.info(f"将对优先课程 {top.get('name')} (lessonId={top_lesson['id']}) 进行 {attempts} 次强制请求")
-        success_force = client.force_send_requests(top_lesson['id'], attempts=attempts, interval=0.25)
+        default_count = ui.question("参与的备选课程数 (按优先级，回车默认1)")
+        try:
+            count = int(default_count) if default_count else 1
+        except Exception:
+            count = 1
+        force_targets = lesson_targets[:max(1, count)]
+        for target in force_targets:
+            ui.info(f"将对课程 {target.get('name')} (lessonId={target['lesson']['id']}) 进行 {attempts} 次强制请求")
+        success_force = client.force_send_requests(
+            [target['lesson']['id'] for target in force_targets], attempts=attempts, interval=0.25
+        )
         if success_force:
             ui.success("已检测到选课成功，程序退出")
             return
@@ -1382,40 +1749,22 @@ def main():
         ui.info(f"将在 {sync_time.strftime('%H:%M:%S')} 同步NTP时间 (距离 {int(wait_seconds)} 秒)")
         
         # 静态等待，每5秒更新一次
-        last_print = time.time()
-        while datetime.now() < sync_time:
-            remaining = (sync_time - datetime.now()).total_seconds()
-            if remaining > 0 and time.time() - last_print >= 5.0:
-                print(f"\r距离NTP同步还有 {int(remaining)} 秒...  ", end='', flush=True)
-                last_print = time.time()
-            time.sleep(1)
-        print()
+        client.flush_log()
+        sleep_until(sync_time, "距离NTP同步还有")
     
-    # 同步时间
-    time_offset = client.sync_time_with_ntp()
-
-    # 同步后对最高优先课程执行完整“搜索-预检-查询结果”流程，验证凭证与会话
-    if lesson_targets:
-        top_target = lesson_targets[0]
-        try:
-            ui.step("优先课程预检流程（搜索→提交→查询结果）")
-            result = client.query_lessons(
-                course_id=top_target.get("course_id"),
-                course_name=top_target.get("name", ""),
-                page_no=1,
-                page_size=10,
-            )
-            lessons = result.get("lessons", [])
-            filtered = client.filter_lessons(lessons, top_target["filter"])
-            if not filtered:
-                ui.warn("预检: 未找到匹配课程，可能是筛选条件或时间段问题")
-            else:
-                warm_lesson = filtered[0]
-                request_id = client.add_course_predicate(warm_lesson["id"], virtual_cost=0)
-                if request_id:
-                    client.get_predicate_response(request_id, max_retries=1)
-        except Exception as exc:
-            ui.warn(f"预检流程失败: {exc}")
+    # 同步时间；同时对最高优先课程执行完整“搜索-预检-查询结果”流程，两者互不依赖，并行以缩短起跑前准备。
+    # 预检过程不输出，待 NTP 输出结束后再打印其结果，避免两者交错
+    with ThreadPoolExecutor(max_workers=2) as preflight:
+        fut_ntp = preflight.submit(client.sync_time_with_ntp)
+        fut_warm = preflight.submit(_warmup_top_target, client, lesson_targets[0]) if lesson_targets else None
+        time_offset = fut_ntp.result()
+    if fut_warm is not None:
+        ui.step("优先课程预检流程（搜索→提交→查询结果）")
+        warm_ok, warm_msg = fut_warm.result()
+        if warm_ok:
+            ui.success(warm_msg)
+        else:
+            ui.warn(warm_msg)
     
     # 7. 依次尝试抢课
     success_any = False